@@ -0,0 +1,397 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import generate_reports
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# The lazy DOTALL lookahead pattern extract_tests_from_file used before the
+# brace-aware scanner, kept here so both can be timed on the same corpus.
+LEGACY_METHOD_PATTERN = re.compile(
+    r'(\[(?:Fact|Theory)\](?:\s*\[InlineData[^\]]*\])*)\s*public void (\w+)\([^)]*\)\s*\{(.*?)(?=\[(?:Fact|Theory)\]|\Z)',
+    re.DOTALL
+)
+
+TESTS_PER_CLASS = 50
+PHASES = ('discovery', 'extract', 'classification', 'render')
+CORPUS_PROJECT = """<Project Sdk="Microsoft.NET.Sdk">
+  <ItemGroup>
+    <PackageReference Include="Microsoft.NET.Test.Sdk" Version="17.8.0" />
+    <PackageReference Include="xunit" Version="2.9.3" />
+  </ItemGroup>
+</Project>
+"""
+
+def load_corpus(paths):
+    """Read every .cs file under the given files/directories"""
+    corpus = []
+    for path in paths:
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = [os.path.join(dirpath, name)
+                     for dirpath, _, names in os.walk(path)
+                     for name in names if name.endswith('.cs')]
+        for file_path in sorted(files):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                corpus.append(f.read())
+    return corpus
+
+def _time_best(func, corpus, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = func(corpus)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, found
+
+def _legacy_scan(corpus):
+    return sum(len(LEGACY_METHOD_PATTERN.findall(content)) for content in corpus)
+
+def _scanner_scan(corpus):
+    return sum(sum(1 for _ in generate_reports.scan_test_methods(content)) for content in corpus)
+
+def benchmark_scanner(corpus, repeat=5):
+    """Compare legacy regex and scanner throughput in MB/s on one corpus"""
+    size_mb = sum(len(content.encode('utf-8')) for content in corpus) / (1024 * 1024)
+    results = {}
+    for label, func in (('legacy regex', _legacy_scan), ('scanner', _scanner_scan)):
+        elapsed, found = _time_best(func, corpus, repeat)
+        results[label] = {
+            'seconds': elapsed,
+            'mb_per_s': size_mb / elapsed if elapsed else float('inf'),
+            'tests': found
+        }
+
+    print(f"Corpus: {len(corpus)} files, {size_mb:.2f} MB")
+    for label, result in results.items():
+        print(f"- {label}: {result['mb_per_s']:.1f} MB/s ({result['seconds'] * 1000:.1f} ms, {result['tests']} tests)")
+    return results
+
+def _synthetic_method(rng, number):
+    kind = rng.random()
+    if kind < 0.6:
+        return [
+            "    [Fact]",
+            f"    public void Method{number}_WithValidInput_ShouldReturnValue()",
+            "    {",
+            "        var repository = new Mock<IRepository>();",
+            f"        repository.Setup(r => r.Get({number})).Returns({number});",
+            "        var service = new Service(repository.Object);",
+            f"        var result = service.Get({number});",
+            f"        Assert.Equal({number}, result);",
+            "    }"
+        ]
+    if kind < 0.85:
+        return [
+            "    [Fact]",
+            f"    public async Task Method{number}_ExistingItem_ShouldUpdateAsync()",
+            "    {",
+            f"        var result = await _controller.Update({number}, new UpdateDto {{ Name = \"item-{number}\" }});",
+            "        // Braces in comments and strings must not confuse the scanner: { \"}\"",
+            "        var ok = Assert.IsType<OkObjectResult>(result);",
+            "        Assert.NotNull(ok.Value);",
+            "    }"
+        ]
+    lines = ["    [Theory]"]
+    for row in range(rng.randint(5, 40)):
+        lines.append(f"    [InlineData({row}, \"case-{row}\")]")
+    lines.extend([
+        f"    public void Method{number}_InvalidInput_ShouldThrow(int value, string text)",
+        "    {",
+        "        Assert.Throws<ArgumentException>(() => Validator.Check(value, text));",
+        "    }"
+    ])
+    return lines
+
+def generate_corpus(directory, test_count, seed=0, tests_per_class=TESTS_PER_CLASS):
+    """Write an AlgorithmBattleArena.Tests-style corpus with test_count test methods"""
+    rng = random.Random(seed)
+    number = 0
+    class_index = 0
+    while number < test_count:
+        class_name = f"Generated{class_index:05d}Tests"
+        lines = [
+            "using Moq;",
+            "using Xunit;",
+            "",
+            "namespace AlgorithmBattleArena.Tests;",
+            "",
+            f"public class {class_name}",
+            "{"
+        ]
+        for _ in range(min(tests_per_class, test_count - number)):
+            lines.extend(_synthetic_method(rng, number))
+            lines.append("")
+            number += 1
+        lines.append("}")
+
+        with open(os.path.join(directory, f"Controllers.{class_name}.cs"), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        class_index += 1
+
+    with open(os.path.join(directory, 'AlgorithmBattleArena.Tests.csproj'), 'w', encoding='utf-8') as f:
+        f.write(CORPUS_PROJECT)
+
+def _phase_functions(corpus_dir):
+    state = {}
+
+    def discovery():
+        projects = generate_reports.discover_test_projects(corpus_dir)
+        state['files'] = generate_reports.project_files(projects, 'unit')
+
+    def extract():
+        state['results'] = [generate_reports.extract_tests_from_file(file_path, True) for file_path in state['files']]
+
+    def classification():
+        for test_name, test_body, inline_data_count in state['methods']:
+            generate_reports.parse_compact_test('unit', test_name, test_body, inline_data_count)
+
+    def render():
+        generate_reports.write_test_report(os.path.join(corpus_dir, 'unit_test_report.md'), "Unit Test Cases Report",
+                                           "Total Unit Test Cases", "Unit Test Classes", state['results'],
+                                           len(state['files']))
+
+    return state, {'discovery': discovery, 'extract': extract, 'classification': classification, 'render': render}
+
+def _scanned_methods(file_paths):
+    methods = []
+    for file_path in file_paths:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for method in generate_reports.scan_test_methods(content):
+            body_start, body_end = method['body']
+            methods.append((method['name'], content[body_start:body_end], max(method['inline_data'], 1)))
+    return methods
+
+def _extract_decoded(file_paths):
+    results = []
+    for file_path in file_paths:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            results.append(generate_reports.extract_tests_from_source(f.read(), True))
+    return results
+
+def _extract_mapped(file_paths):
+    return [generate_reports.extract_tests_from_file(file_path, True) for file_path in file_paths]
+
+# Whole-file decode then str scanning, against scanning the memory-mapped bytes
+EXTRACT_PATHS = {'decoded': _extract_decoded, 'mmap': _extract_mapped}
+
+def _results_digest(results):
+    digest = hashlib.sha256()
+    for class_name, tests in results:
+        digest.update(json.dumps([class_name, [test.to_dict() for test in tests]]).encode('utf-8'))
+    return digest.hexdigest()
+
+def _peak_rss_kb():
+    """Peak RSS of this process in kilobytes, or None where it cannot be read"""
+    # ru_maxrss survives fork and exec, so a fresh child would report its
+    # parent's peak; VmHWM starts over with the new program
+    try:
+        with open('/proc/self/status', 'r', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+def _extract_peak_rss(path, file_paths):
+    # Runs in a fresh process so each path's peak is its own; results are
+    # dropped per file as the report pipeline does after rendering
+    for file_path in file_paths:
+        EXTRACT_PATHS[path]([file_path])
+    return _peak_rss_kb()
+
+def benchmark_extract_paths(file_paths, repeat=3):
+    """Throughput, traced heap peak and process peak RSS of each extract path on the same files"""
+    size_mb = sum(os.path.getsize(file_path) for file_path in file_paths) / (1024 * 1024)
+    results = {}
+    for path, extract in EXTRACT_PATHS.items():
+        elapsed, found = _time_best(extract, file_paths, repeat)
+        tracemalloc.start()
+        for file_path in file_paths:
+            extract([file_path])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        with multiprocessing.get_context('spawn').Pool(1) as pool:
+            max_rss_kb = pool.apply(_extract_peak_rss, (path, file_paths))
+        results[path] = {
+            'seconds': elapsed,
+            'mb_per_s': size_mb / elapsed if elapsed else float('inf'),
+            'peak_bytes': peak,
+            'max_rss_kb': max_rss_kb,
+            'digest': _results_digest(found)
+        }
+    results['identical'] = len({result['digest'] for result in results.values()}) == 1
+    return results
+
+def _measure_model(build):
+    tracemalloc.start()
+    model = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    del model
+    return {'retained_bytes': retained, 'peak_bytes': peak, 'live_blocks': blocks}
+
+def compare_test_models(methods):
+    """Memory and live allocations of dict-per-case entries vs compact ParsedTest objects"""
+    return {
+        'dict_per_case': _measure_model(lambda: [
+            generate_reports.parse_unit_test_method(test_name, test_body, inline_data_count)
+            for test_name, test_body, inline_data_count in methods
+        ]),
+        'compact': _measure_model(lambda: [
+            generate_reports.parse_compact_test('unit', test_name, test_body, inline_data_count)
+            for test_name, test_body, inline_data_count in methods
+        ])
+    }
+
+def benchmark_corpus(corpus_dir, repeat=3):
+    """Time each report phase on one corpus, then measure its peak traced memory"""
+    state, phases = _phase_functions(corpus_dir)
+    results = {}
+
+    for phase in PHASES:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            phases[phase]()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[phase] = {'seconds': best}
+        if phase == 'discovery':
+            # Classification is timed on its own, so scan the bodies up front
+            state['methods'] = _scanned_methods(state['files'])
+
+    # tracemalloc slows allocation down, so peaks come from a separate pass
+    for phase in PHASES:
+        tracemalloc.start()
+        phases[phase]()
+        results[phase]['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    corpus = load_corpus(state['files'])
+    return {
+        'extract_paths': benchmark_extract_paths(state['files'], repeat),
+        'files': len(state['files']),
+        'methods': len(state['methods']),
+        'test_cases': sum(test.case_count for _, tests in state['results'] for test in tests),
+        'bytes': sum(os.path.getsize(file_path) for file_path in state['files']),
+        'phases': results,
+        'test_model': compare_test_models(state['methods']),
+        'scanner': benchmark_scanner(corpus, repeat=1)
+    }
+
+def run_benchmarks(sizes, repeat=3, seed=0, tests_per_class=TESTS_PER_CLASS):
+    results = {
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': sys.version.split()[0],
+        'corpora': {}
+    }
+    for size in sizes:
+        corpus_dir = tempfile.mkdtemp(prefix=f'bench-{size}-')
+        try:
+            generate_corpus(corpus_dir, size, seed, tests_per_class)
+            print(f"== {size} test methods ==")
+            corpus = benchmark_corpus(corpus_dir, repeat)
+        finally:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+        for phase in PHASES:
+            phase_result = corpus['phases'][phase]
+            print(f"- {phase}: {phase_result['seconds'] * 1000:.1f} ms, peak {phase_result['peak_bytes'] / (1024 * 1024):.1f} MB")
+        extract_paths = corpus['extract_paths']
+        for path in EXTRACT_PATHS:
+            path_result = extract_paths[path]
+            rss = f", peak RSS {path_result['max_rss_kb'] / 1024:.1f} MB" if path_result['max_rss_kb'] else ""
+            print(f"- extract ({path}): {path_result['mb_per_s']:.1f} MB/s, "
+                  f"heap peak {path_result['peak_bytes'] / (1024 * 1024):.1f} MB{rss}")
+        print(f"- extract paths agree: {'yes' if extract_paths['identical'] else 'NO'}")
+        for model, usage in corpus['test_model'].items():
+            print(f"- {model} model: {usage['retained_bytes'] / (1024 * 1024):.1f} MB retained, {usage['live_blocks']} live blocks")
+        results['corpora'][str(size)] = corpus
+
+    # ru_maxrss is kilobytes on Linux
+    results['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+    return results
+
+def compare_with_baseline(results, baseline, threshold, min_seconds=0.01):
+    """Return the phases that got slower than baseline by more than threshold"""
+    regressions = []
+    for size, corpus in results['corpora'].items():
+        baseline_corpus = baseline.get('corpora', {}).get(size)
+        if not baseline_corpus:
+            continue
+        for phase, phase_result in corpus['phases'].items():
+            baseline_phase = baseline_corpus['phases'].get(phase)
+            if not baseline_phase:
+                continue
+            # Ignore phases too short to time reliably
+            allowed = max(baseline_phase['seconds'] * (1 + threshold), min_seconds)
+            if phase_result['seconds'] > allowed:
+                regressions.append((size, phase, baseline_phase['seconds'], phase_result['seconds']))
+    return regressions
+
+def main():
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Benchmark report generation on synthetic test corpora")
+    parser.add_argument('--sizes', default='100,10000,100000',
+                        help="comma-separated test method counts to generate (default: 100,10000,100000)")
+    parser.add_argument('--repeat', type=int, default=3, help="timing runs per phase, best is kept (default: 3)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for corpus generation")
+    parser.add_argument('--tests-per-file', type=int, default=TESTS_PER_CLASS,
+                        help=f"test methods per generated class file; raise it to time very large files "
+                             f"(default: {TESTS_PER_CLASS})")
+    parser.add_argument('--output', default='benchmark_results.json', help="where to write the JSON results")
+    parser.add_argument('--baseline', help="JSON results to compare against; exit 1 on regression")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown per phase against the baseline (default: 0.25 = 25%%)")
+    parser.add_argument('--scanner', nargs='*', metavar='PATH',
+                        help="only compare legacy regex and scanner throughput on these files/directories "
+                             "(default: the repository's test projects)")
+    args = parser.parse_args()
+
+    if args.scanner is not None:
+        paths = args.scanner or [
+            os.path.join(root_dir, 'AlgorithmBattleArena.Tests'),
+            os.path.join(root_dir, 'AlgorithmBattleArena.UiTests')
+        ]
+        benchmark_scanner(load_corpus(paths))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    results = run_benchmarks(sizes, args.repeat, args.seed, args.tests_per_file)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results written: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        for size, phase, before, after in regressions:
+            print(f"REGRESSION {size} tests / {phase}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"No phase regressed by more than {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
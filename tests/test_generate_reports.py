@@ -0,0 +1,264 @@
+import json
+import os
+import re
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_reports
+
+
+class ConsoleFailureTests(unittest.TestCase):
+    def test_result_line_duration_is_not_part_of_the_name(self):
+        failures = generate_reports.parse_console_failures([
+            "  Failed AlgorithmBattleArena.Tests.AuthControllerTests.Login_WrongPassword_ReturnsUnauthorized [12 ms]",
+            "  Error Message:",
+            "Failed AlgorithmBattleArena.Tests.AuthControllerTests.Login_WrongPassword_ReturnsUnauthorized"
+        ])
+        self.assertEqual(failures, [{
+            'name': 'AlgorithmBattleArena.Tests.AuthControllerTests.Login_WrongPassword_ReturnsUnauthorized',
+            'class': 'AuthControllerTests',
+            'method': 'Login_WrongPassword_ReturnsUnauthorized',
+            'error': 'Test execution failed'
+        }])
+
+    def test_rerun_filter_targets_the_failed_method(self):
+        failures = generate_reports.parse_console_failures([
+            "  Failed AlgorithmBattleArena.Tests.PagedResultTests.Create_ComputesPages(total: 10) [< 1 ms]"
+        ])
+        targets = [generate_reports._failure_key(failure) for failure in failures]
+        self.assertEqual(generate_reports.build_test_filter(targets),
+                         "FullyQualifiedName~PagedResultTests.Create_ComputesPages")
+
+    def test_summary_line_is_not_a_failure(self):
+        self.assertEqual(generate_reports.parse_console_failures([
+            "Failed!  - Failed:     3, Passed:    10, Skipped:     0, Total:    13, Duration: 1 s - "
+            "AlgorithmBattleArena.Tests.dll (net8.0)"
+        ]), [])
+
+
+class CProfileTests(unittest.TestCase):
+    @unittest.skipIf(sys.version_info >= (3, 12), "one cProfile profiler sees every thread from Python 3.12")
+    def test_work_handed_to_a_thread_is_profiled(self):
+        import pstats
+        from concurrent.futures import ThreadPoolExecutor
+        with mock.patch.dict(generate_reports.CPROFILE, enabled=True, profilers=[]):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(generate_reports.run_profiled, generate_reports.problem_slug, "Two Sum").result()
+            stats = pstats.Stats(*generate_reports.CPROFILE['profilers'])
+        self.assertIn('problem_slug', {function for _, _, function in stats.stats})
+
+
+class IncompleteRunTests(unittest.TestCase):
+    def test_failed_build_is_not_a_clean_run(self):
+        project = {'name': 'AlgorithmBattleArena.Tests', 'path': '.', 'kind': 'unit', 'files': []}
+        with mock.patch.object(generate_reports, 'build_test_project', return_value=False):
+            with self.assertRaises(generate_reports.IncompleteTestRun) as raised:
+                generate_reports.run_tests_and_get_failures([project])
+        self.assertEqual(raised.exception.reasons, ["dotnet build of AlgorithmBattleArena.Tests failed"])
+        self.assertEqual(raised.exception.failures, [])
+    
+    def test_bug_report_states_the_run_is_incomplete(self):
+        incomplete = generate_reports.IncompleteTestRun(["dotnet build of AlgorithmBattleArena.Tests failed"], [])
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.object(generate_reports, 'ROOT_DIR', directory), \
+                    mock.patch.object(generate_reports, 'run_tests_and_get_failures', side_effect=incomplete):
+                self.assertIsNone(generate_reports.generate_bug_report([]))
+            with open(os.path.join(directory, 'bug_report.md'), encoding='utf-8') as f:
+                report = f.read()
+        self.assertIn("## Test Run Incomplete", report)
+        self.assertIn("- dotnet build of AlgorithmBattleArena.Tests failed", report)
+    
+    def test_incomplete_run_keeps_the_stored_failures(self):
+        stored = [{'name': 'Ns.PagedResultTests.Create_ComputesPages', 'class': 'PagedResultTests',
+                   'method': 'Create_ComputesPages', 'error': 'Assert.Equal() Failure'}]
+        incomplete = generate_reports.IncompleteTestRun(["dotnet build of AlgorithmBattleArena.Tests failed"], [])
+        with tempfile.TemporaryDirectory() as directory:
+            state_file = os.path.join(directory, 'bug_report.json')
+            generate_reports.save_failure_state(state_file, stored)
+            with mock.patch.object(generate_reports, 'ROOT_DIR', directory), \
+                    mock.patch.object(generate_reports, 'run_tests_and_get_failures', side_effect=incomplete):
+                generate_reports.generate_bug_report([])
+            self.assertEqual(generate_reports.load_failure_state(state_file), stored)
+
+
+class ShardingTests(unittest.TestCase):
+    def test_tests_are_credited_to_their_class_not_the_files_first_class(self):
+        source = (
+            "public class TestWebApplicationFactory : WebApplicationFactory<Program>\n{\n}\n\n"
+            "public class ProgramTests\n{\n"
+            "    [Fact]\n    public void App_Starts() { Assert.True(true); }\n\n"
+            "    [Theory]\n    [InlineData(1)]\n    public void Route_Exists(int id) { Assert.True(id > 0); }\n}\n"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'ProgramTests.cs')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            classes = generate_reports.discover_test_classes({'files': [file_path]})
+        self.assertEqual(classes, [('ProgramTests', 2)])
+
+    def test_tests_after_a_nested_helper_class_stay_with_the_outer_class(self):
+        source = (
+            "namespace Tests\n{\n"
+            "    public class Services_OpenAiMicroCourseServiceTests\n    {\n"
+            "        private sealed class FuncHandler : HttpMessageHandler\n        {\n"
+            "            // a { brace in a comment\n"
+            "            protected override Task<HttpResponseMessage> SendAsync() => Task.FromResult(\"}\");\n"
+            "        }\n\n"
+            "        private static T Create<T>() where T : class\n        {\n            return null;\n        }\n\n"
+            "        [Fact]\n        public async Task Generate_ReturnsCourse() { await Task.Yield(); }\n"
+            "    }\n}\n"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'Services.OpenAiMicroCourseServiceTests.cs')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            classes = generate_reports.discover_test_classes({'files': [file_path]})
+        self.assertEqual(classes, [('Services_OpenAiMicroCourseServiceTests', 1)])
+    
+    def test_exclusion_filter_covers_tests_outside_every_class(self):
+        self.assertEqual(generate_reports.build_exclusion_filter(['ProgramTests', 'AuthControllerTests']),
+                         "FullyQualifiedName!~ProgramTests&FullyQualifiedName!~AuthControllerTests")
+
+
+class ClassificationRulesTests(unittest.TestCase):
+    def load(self, rules):
+        with tempfile.TemporaryDirectory() as directory:
+            rules_file = os.path.join(directory, 'rules.json')
+            with open(rules_file, 'w', encoding='utf-8') as f:
+                json.dump(rules, f)
+            return generate_reports.load_classification_rules(rules_file)
+    
+    def test_keys_left_out_of_a_kind_keep_the_defaults(self):
+        steps = [{'keywords': ['Assert'], 'step': "1. Check it"}]
+        rules = self.load({'unit': {'steps': steps}})
+        defaults = generate_reports.DEFAULT_CLASSIFICATION_RULES
+        self.assertEqual(rules['unit'], dict(defaults['unit'], steps=steps))
+        self.assertEqual(rules['selenium'], defaults['selenium'])
+        # The merged rules still compile
+        generate_reports.compile_classifier(rules['unit'])
+    
+    def test_malformed_rules_name_the_offending_entry(self):
+        for rules, message in (({'integration': {}}, "unknown test kind integration"),
+                               ({'unit': {'step': []}}, "unknown key step in 'unit'"),
+                               ({'unit': {'expected': "passes"}}, "'unit.expected' must be a list"),
+                               ({'unit': {'steps': [{'keywords': ['new ']}]}},
+                                "'unit.steps[0]' must be an object with keywords and step")):
+            with self.assertRaisesRegex(ValueError, re.escape(message)):
+                self.load(rules)
+
+
+class JsonArrayTests(unittest.TestCase):
+    def test_numbers_cut_at_a_read_boundary_are_read_whole(self):
+        document = '[12.5, -3e+10, 7E-2, 0.25e1, 42, true, "x", {"a": 1.5}, [1e2], 3.75]'
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'problems.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(document)
+            # Every small read size cuts some number right after '.', 'e' or its sign
+            for read_size in range(1, len(document) + 1):
+                self.assertEqual(list(generate_reports.iter_json_array(path, read_size)), json.loads(document))
+
+
+class ProblemValidationTests(unittest.TestCase):
+    def summarize(self, title, difficulty='Easy'):
+        record = {'title': title, 'description': "Sum two numbers", 'difficultyLevel': difficulty,
+                  'testCases': [{'inputData': "1 2", 'expectedOutput': "3"}]}
+        return generate_reports.summarize_problem(record, 'problems.json', 1)
+    
+    def test_title_length_counts_trailing_spaces_like_the_import(self):
+        self.assertEqual(self.summarize('a' * 199 + '  ')['errors'],
+                         [('title', "Title must be 200 characters or less")])
+        self.assertEqual(self.summarize('a' * 200)['errors'], [])
+        self.assertEqual(self.summarize('   ')['errors'], [('title', "Title is required")])
+    
+    def test_padded_difficulty_is_rejected_like_the_import(self):
+        self.assertEqual(self.summarize('Two Sum', ' Easy')['errors'],
+                         [('difficultyLevel', "Difficulty must be Easy, Medium, Hard, or numeric 1-5")])
+
+
+class ParseCacheTests(unittest.TestCase):
+    def test_warm_run_does_not_rewrite_the_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_paths = []
+            for name in ('LoginTests', 'LogoutTests'):
+                file_paths.append(os.path.join(directory, name + '.cs'))
+                with open(file_paths[-1], 'w', encoding='utf-8') as f:
+                    f.write(f"public class {name}\n{{\n    [Fact]\n    public void Works() {{ }}\n}}\n")
+            cache_file = os.path.join(directory, 'cache.json')
+            
+            cold = generate_reports.load_parse_cache(cache_file)
+            generate_reports.parse_test_files(file_paths, True, cache=cold)
+            generate_reports.save_parse_cache(cold)
+            written = os.stat(cache_file).st_mtime_ns
+            os.utime(cache_file, ns=(written - 10**9, written - 10**9))
+            
+            warm = generate_reports.load_parse_cache(cache_file)
+            generate_reports.parse_test_files(file_paths, True, cache=warm)
+            generate_reports.save_parse_cache(warm)
+            self.assertEqual((warm['hits'], warm['misses']), (2, 0))
+            self.assertEqual(os.stat(cache_file).st_mtime_ns, written - 10**9)
+            
+            # A deleted file is pruned, which does need a write
+            os.remove(file_paths[1])
+            pruned = generate_reports.load_parse_cache(cache_file)
+            generate_reports.save_parse_cache(pruned)
+            self.assertEqual(len(generate_reports.load_parse_cache(cache_file)['files']), 1)
+
+
+class RunHistoryTests(unittest.TestCase):
+    def test_kinds_left_out_with_only_are_not_reported_removed(self):
+        def tests(*names):
+            return [('LoginTests', [generate_reports.ParsedTest(name, '', [], '', 1, []) for name in names])]
+        
+        with tempfile.TemporaryDirectory() as directory:
+            db_file = os.path.join(directory, 'history.db')
+            full_run = generate_reports.begin_catalog_run(db_file)
+            generate_reports.record_tests(full_run, 'unit', tests('Login_Succeeds', 'Login_Fails'), ['LoginTests.cs'])
+            generate_reports.record_tests(full_run, 'selenium', tests('Login_Page_Loads'), ['LoginTests.cs'])
+            
+            unit_run = generate_reports.begin_catalog_run(db_file)
+            generate_reports.record_tests(unit_run, 'unit', tests('Login_Succeeds', 'Login_Locks'), ['LoginTests.cs'])
+            
+            self.assertEqual(generate_reports.compared_kinds(unit_run, full_run['run_id']), ['unit'])
+            self.assertEqual(generate_reports.tests_added_since(unit_run, full_run['run_id']),
+                             [('unit', 'LoginTests', 'Login_Locks')])
+            self.assertEqual(generate_reports.tests_removed_since(unit_run, full_run['run_id']),
+                             [('unit', 'LoginTests', 'Login_Fails')])
+
+    
+    def test_runs_with_the_same_tests_have_no_differences(self):
+        def tests(*names):
+            return [('LoginTests', [generate_reports.ParsedTest(name, '', [], '', 1, []) for name in names])]
+        
+        with tempfile.TemporaryDirectory() as directory:
+            db_file = os.path.join(directory, 'history.db')
+            runs = []
+            for names in (('A', 'C'), ('A', 'B'), ('A', 'C')):
+                runs.append(generate_reports.begin_catalog_run(db_file))
+                generate_reports.record_tests(runs[-1], 'unit', tests(*names), ['LoginTests.cs'])
+            
+            self.assertEqual(generate_reports.tests_added_since(runs[2], runs[0]['run_id']), [])
+            self.assertEqual(generate_reports.tests_removed_since(runs[2], runs[0]['run_id']), [])
+            self.assertEqual(generate_reports.tests_added_since(runs[2], runs[1]['run_id']),
+                             [('unit', 'LoginTests', 'C')])
+            self.assertEqual(generate_reports.tests_removed_since(runs[2], runs[1]['run_id']),
+                             [('unit', 'LoginTests', 'B')])
+    
+    def test_tests_sharing_class_and_name_in_different_files_stay_apart(self):
+        # Both classes are sealed, so neither file yields a class name
+        class_results = [('Unknown', [generate_reports.ParsedTest('Works', '', ['1. Setup mock objects'], '', 1, [])]),
+                         ('Unknown', [generate_reports.ParsedTest('Works', '', ['1. Verify results'], '', 1, [])])]
+        with tempfile.TemporaryDirectory() as directory:
+            catalog = generate_reports.begin_catalog_run(os.path.join(directory, 'history.db'))
+            generate_reports.record_tests(catalog, 'unit', class_results, ['FirstTests.cs', 'SecondTests.cs'])
+            recorded = generate_reports.load_run_tests(catalog, 'unit')
+        self.assertEqual([(class_name, [test.steps for test in tests]) for class_name, tests in recorded],
+                         [('Unknown', [['1. Setup mock objects']]), ('Unknown', [['1. Verify results']])])
+
+
+if __name__ == '__main__':
+    unittest.main()